@@ -1,23 +1,140 @@
 import argparse
+import asyncio
+import functools
 import json
+import math
 import os
+import time
+from collections import OrderedDict
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, cast, Literal
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, cast, Literal
+from urllib.parse import parse_qs, urlsplit
 
-import yaml
-import httpx
-from fastmcp import FastMCP
-from dotenv import load_dotenv
+# yaml, httpx, fastmcp and dotenv are imported where they are first needed
+# so that e.g. --help does not pay their import cost
+if TYPE_CHECKING:
+    import httpx
+    from fastmcp import FastMCP
 
-load_dotenv()
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
 
 # Server metadata
 server_name = "mcp-server-productive"
 tag_major_version = 1
 tag_minor_version = 0
 
+# Environment variables the server reads, possibly from .env
+env_var_names = (
+    "PRODUCTIVE_API_TOKEN",
+    "PRODUCTIVE_ORG_ID",
+    "SERVICE_CONFIG_FILE",
+    "PRODUCTIVE_MCP_ENDPOINT",
+)
+
+# Page size count_tasks recommends for list_tasks
+recommended_page_size = 10
+
+# Maximum number of GET responses kept for conditional requests
+response_cache_size = 128
+
+# HTTP clients shared by every session in the process, keyed by base URL and
+# headers. The lifespan runs per session, so these are closed in main() instead
+_http_clients: Dict[Tuple, "httpx.AsyncClient"] = {}
+
+
+def get_http_client(base_url: str, headers: Dict[str, str]) -> "httpx.AsyncClient":
+    """
+    Get the process-wide HTTP client for a base URL and set of headers.
+    
+    Parameters
+    ----------
+    base_url : str
+        Base URL requests are made against
+    headers : Dict[str, str]
+        Headers sent with every request
+    
+    Returns
+    -------
+    httpx.AsyncClient
+        Client created on first use and reused until close_http_clients()
+    """
+    key = (base_url, tuple(sorted(headers.items())))
+    client = _http_clients.get(key)
+    if client is None or client.is_closed:
+        import httpx
+        
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+        )
+        _http_clients[key] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close every process-wide HTTP client."""
+    while _http_clients:
+        _, client = _http_clients.popitem()
+        await client.aclose()
+
+
+def parse_max_age(cache_control: Optional[str]) -> Optional[float]:
+    """
+    Extract the freshness lifetime from a Cache-Control header.
+    
+    Parameters
+    ----------
+    cache_control : Optional[str]
+        Raw Cache-Control header value
+    
+    Returns
+    -------
+    Optional[float]
+        Seconds the response may be served without revalidation, 0 if it
+        must always be revalidated, or None if it must not be cached at all
+    """
+    if not cache_control:
+        return 0.0
+    
+    directives = {}
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name] = value.strip('"')
+    
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    try:
+        return float(directives.get("max-age", 0))
+    except ValueError:
+        return 0.0
+
+
+@functools.cache
+def yaml_loader() -> type:
+    """Return the LibYAML-backed safe loader if available, else SafeLoader."""
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:
+        from yaml import SafeLoader as loader
+    return loader
+
 
 class ProductiveService:
     """
@@ -54,6 +171,11 @@ class ProductiveService:
         self.api_token = api_token
         self.org_id = org_id
         self.base_url = "https://api.productive.io/api/v2"
+        self._headers = {
+            "X-Auth-Token": api_token,
+            "X-Organization-Id": org_id,
+            "Content-Type": "application/vnd.api+json",
+        }
         self.transport = cast(
             Literal["stdio", "http", "sse", "streamable-http"], transport
         )
@@ -68,6 +190,10 @@ class ProductiveService:
         self.people_enabled = True
         self.pages_enabled = True
         
+        # Parsed service configuration, cached as (mtime, config)
+        self._parsed_config: Optional[Dict[str, Any]] = None
+        self._parsed_config_mtime: Optional[float] = None
+        
         # Load service configuration if provided
         if service_config_file:
             self.service_config_file = str(Path(service_config_file).expanduser().resolve())
@@ -76,16 +202,35 @@ class ProductiveService:
         else:
             self.service_config_file = None
             self.config_path_uri = None
+        
+        # GET responses keyed by (endpoint, params) -> (etag, expires_at, body)
+        self._response_cache: OrderedDict[Tuple, Tuple[Optional[str], float, Dict[str, Any]]] = OrderedDict()
+        
+        # Shared HTTP client so connections are pooled across API calls
+        self._client = get_http_client(self.base_url, self.get_headers())
     
-    def unpack_service_specs(self) -> None:
+    def load_service_config(self) -> Dict[str, Any]:
         """
-        Load and parse service specifications from configuration file.
+        Return the parsed service configuration.
         
-        Reads the YAML configuration file and extracts tool configurations.
+        The YAML file is only re-read and re-parsed when its modification
+        time changes; otherwise the cached configuration is returned.
         """
         try:
-            with open(self.service_config_file, "r") as file:
-                service_config = yaml.safe_load(file)
+            mtime = os.stat(self.service_config_file).st_mtime
+        except FileNotFoundError:
+            print(f"Service configuration file not found: {self.service_config_file}")
+            raise
+        
+        if self._parsed_config is not None and mtime == self._parsed_config_mtime:
+            return self._parsed_config
+        
+        import yaml
+        
+        try:
+            service_config = yaml.load(
+                Path(self.service_config_file).read_bytes(), Loader=yaml_loader()
+            )
         except FileNotFoundError:
             print(f"Service configuration file not found: {self.service_config_file}")
             raise
@@ -96,6 +241,18 @@ class ProductiveService:
             print(f"Unexpected error loading service config: {e}")
             raise
         
+        self._parsed_config = service_config
+        self._parsed_config_mtime = mtime
+        return service_config
+    
+    def unpack_service_specs(self) -> None:
+        """
+        Load and parse service specifications from configuration file.
+        
+        Reads the YAML configuration file and extracts tool configurations.
+        """
+        service_config = self.load_service_config()
+        
         try:
             tools_config = service_config.get("tools", {})
             self.projects_enabled = tools_config.get("projects", True)
@@ -111,47 +268,62 @@ class ProductiveService:
     
     def get_headers(self) -> Dict[str, str]:
         """Get authentication headers for API calls."""
-        return {
-            "X-Auth-Token": self.api_token,
-            "X-Organization-Id": self.org_id,
-            "Content-Type": "application/vnd.api+json",
-        }
+        return self._headers
     
     async def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make GET request to Productive API"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}{endpoint}",
-                headers=self.get_headers(),
-                params=params,
-                timeout=30.0
-            )
+        """
+        Make GET request to Productive API.
+        
+        Responses are cached per endpoint and params. Fresh entries (per
+        Cache-Control max-age) are served without a request; stale entries
+        with an ETag are revalidated with If-None-Match. Any successful
+        POST or PATCH clears the cache.
+        """
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        cached = self._response_cache.get(key)
+        
+        headers = None
+        if cached is not None:
+            etag, expires_at, body = cached
+            if time.monotonic() < expires_at:
+                self._response_cache.move_to_end(key)
+                return body
+            if etag:
+                headers = {"If-None-Match": etag}
+        
+        response = await self._client.get(endpoint, params=params, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            etag = response.headers.get("ETag", cached[0])
+            body = cached[2]
+        else:
             response.raise_for_status()
-            return response.json()
+            etag = response.headers.get("ETag")
+            body = _loads(response.content)
+        
+        max_age = parse_max_age(response.headers.get("Cache-Control"))
+        if max_age is None or (not etag and not max_age):
+            self._response_cache.pop(key, None)
+            return body
+        
+        self._response_cache[key] = (etag, time.monotonic() + max_age, body)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > response_cache_size:
+            self._response_cache.popitem(last=False)
+        return body
     
     async def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Make POST request to Productive API"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}{endpoint}",
-                headers=self.get_headers(),
-                json=data,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._client.post(endpoint, json=data)
+        response.raise_for_status()
+        self._response_cache.clear()
+        return _loads(response.content)
     
     async def patch(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Make PATCH request to Productive API"""
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{self.base_url}{endpoint}",
-                headers=self.get_headers(),
-                json=data,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._client.patch(endpoint, json=data)
+        response.raise_for_status()
+        self._response_cache.clear()
+        return _loads(response.content)
 
 
 def get_var(var_name: str, env_var_name: str, args) -> Optional[str]:
@@ -220,7 +392,7 @@ def create_lifespan(args):
     
     @asynccontextmanager
     async def create_productive_service(
-        server: FastMCP,
+        server: "FastMCP",
     ) -> AsyncIterator[ProductiveService]:
         """
         Create main entry point for the Productive.io MCP server.
@@ -264,7 +436,7 @@ def create_lifespan(args):
     return create_productive_service
 
 
-def initialize_resources(productive_service: ProductiveService, server: FastMCP):
+def initialize_resources(productive_service: ProductiveService, server: "FastMCP"):
     """Initialize MCP resources."""
     
     @server.resource(productive_service.config_path_uri)
@@ -275,171 +447,272 @@ def initialize_resources(productive_service: ProductiveService, server: FastMCP)
         Provides access to the YAML tools configuration file as JSON.
         """
         try:
-            with open(productive_service.service_config_file, "r") as file:
-                tools_config = yaml.safe_load(file)
-            return tools_config
+            return productive_service.load_service_config()
         except Exception as e:
             print(f"Error loading tools config: {e}")
             raise
 
 
-def initialize_tools(productive_service: ProductiveService, server: FastMCP):
-    """Initialize all MCP tools based on service configuration."""
+def summarize_tasks(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize task data to reduce tokens."""
+    items = data.get("data", [])
+    if not isinstance(items, list):
+        items = [items]
     
-    # Helper function for summarization
-    def summarize_tasks(data: Dict[str, Any]) -> Dict[str, Any]:
-        """Summarize task data to reduce tokens."""
-        items = data.get("data", [])
-        if not isinstance(items, list):
-            items = [items]
-        
-        summarized = []
-        for item in items:
-            attrs = item.get("attributes", {})
-            relationships = item.get("relationships", {})
-            
-            summarized.append({
-                "id": item.get("id"),
-                "title": attrs.get("title"),
-                "number": attrs.get("task_number"),
-                "closed": attrs.get("closed", False),
-                "due_date": attrs.get("due_date"),
-                "assignee_id": (
-                    relationships.get("assignee", {}).get("data", {}).get("id")
-                    if relationships.get("assignee", {}).get("data")
-                    else None
-                ),
-                "project_id": (
-                    relationships.get("project", {}).get("data", {}).get("id")
-                    if relationships.get("project", {}).get("data")
-                    else None
-                ),
-            })
-        
-        links = data.get("links", {})
-        return {
-            "count": len(summarized),
-            "tasks": summarized,
-            "pagination": {
-                "has_next": links.get("next") is not None,
-                "has_prev": links.get("prev") is not None,
-                "next_page": links.get("next"),
-            },
-            "note": "Use get_task(task_id) for full task details"
+    summarized = [None] * len(items)
+    for i, item in enumerate(items):
+        item_get = item.get
+        attrs = item_get("attributes") or {}
+        relationships = item_get("relationships") or {}
+        assignee = (relationships.get("assignee") or {}).get("data") or {}
+        project = (relationships.get("project") or {}).get("data") or {}
+        
+        summarized[i] = {
+            "id": item_get("id"),
+            "title": attrs.get("title"),
+            "number": attrs.get("task_number"),
+            "closed": attrs.get("closed", False),
+            "due_date": attrs.get("due_date"),
+            "assignee_id": assignee.get("id"),
+            "project_id": project.get("id"),
         }
     
-    # Tasks tools with optimization
-    if productive_service.tasks_enabled:
+    links = data.get("links", {})
+    return {
+        "count": len(summarized),
+        "tasks": summarized,
+        "pagination": {
+            "has_next": links.get("next") is not None,
+            "has_prev": links.get("prev") is not None,
+            "next_page": links.get("next"),
+        },
+        "note": "Use get_task(task_id) for full task details"
+    }
+
+
+def estimate_task_count(data: Dict[str, Any], page_size: int) -> Tuple[int, int, bool]:
+    """
+    Get the task count and page count from a task list response.
+    
+    Parameters
+    ----------
+    data : Dict[str, Any]
+        Task list response from the Productive API
+    page_size : int
+        The page[size] the response was requested with
+    
+    Returns
+    -------
+    Tuple[int, int, bool]
+        Total tasks, pages at page_size, and whether the total is exact.
+        meta.total_count (requested with stats[total]=count) is exact; without
+        it the total is estimated from the last pagination link, which is
+        only exact when page_size is 1.
+    """
+    total_count = (data.get("meta") or {}).get("total_count")
+    if total_count is not None:
+        total = int(total_count)
+        return total, max(1, math.ceil(total / page_size)), True
+    
+    # Parse last page to estimate count
+    links = data.get("links", {})
+    last_link = links.get("last", "")
+    
+    if last_link:
+        query = parse_qs(urlsplit(last_link).query)
+        total_pages = int(query.get("page[number]", ["1"])[0])
+        return total_pages * page_size, total_pages, page_size == 1
+    
+    items = data.get("data", [])
+    return len(items) if isinstance(items, list) else 1, 1, False
+
+
+def task_filters(
+    project_id: Optional[str],
+    assignee_id: Optional[str],
+    closed: Optional[bool],
+) -> Dict[str, Any]:
+    """Build JSON:API filter params for task queries."""
+    return {
+        key: value
+        for key, value in (
+            ("filter[project_id]", project_id or None),
+            ("filter[assignee_id]", assignee_id or None),
+            ("filter[closed]", None if closed is None else str(closed).lower()),
+        )
+        if value is not None
+    }
+
+
+class TaskTools:
+    """
+    Task tools for the Productive.io MCP server.
+    
+    Tools are registered on the server as bound methods, so they are plain
+    module-level code rather than closures created per server.
+    
+    Parameters
+    ----------
+    productive_service : ProductiveService
+        Service used to make Productive.io API calls
+    """
+    
+    def __init__(self, productive_service: ProductiveService):
+        self.productive_service = productive_service
+    
+    async def count_tasks(
+        self,
+        project_id: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        closed: Optional[bool] = None,
+    ) -> str:
+        """
+        Get the count of tasks matching filters.
+        Use this FIRST before listing tasks to check if pagination is needed.
         
-        @server.tool()
-        async def count_tasks(
-            project_id: Optional[str] = None,
-            assignee_id: Optional[str] = None,
-            closed: Optional[bool] = None,
-        ) -> str:
-            """
-            Get the count of tasks matching filters.
-            Use this FIRST before listing tasks to check if pagination is needed.
-            
-            Args:
-                project_id: Filter by project ID
-                assignee_id: Filter by assignee ID
-                closed: Filter by closed status
-            """
-            params = {"page[number]": 1, "page[size]": 1}
-            
-            if project_id:
-                params["filter[project_id]"] = project_id
-            if assignee_id:
-                params["filter[assignee_id]"] = assignee_id
-            if closed is not None:
-                params["filter[closed]"] = str(closed).lower()
-            
-            result = await productive_service.get("/tasks", params=params)
-            
-            # Parse last page to estimate count
-            links = result.get("links", {})
-            last_link = links.get("last", "")
-            
-            import re
-            total_pages = 1
-            if last_link:
-                match = re.search(r'page\[number\]=(\d+)', last_link)
-                if match:
-                    total_pages = int(match.group(1))
-            
-            estimated_total = total_pages * 30  # Default page size
-            
-            info = {
-                "estimated_total": estimated_total,
-                "estimated_pages": total_pages,
-                "recommendation": (
-                    f"Approximately {estimated_total} tasks found. "
-                    f"Recommend requesting pages 1-{min(3, total_pages)} with page_size=10 "
-                    f"to stay under token limits."
-                )
-            }
-            
-            return json.dumps(info, indent=2)
-        
-        @server.tool()
-        async def list_tasks(
-            project_id: Optional[str] = None,
-            assignee_id: Optional[str] = None,
-            closed: Optional[bool] = None,
-            page: int = 1,
-            page_size: int = 10,
-        ) -> str:
-            """
-            List tasks from Productive.io with automatic summarization.
-            Returns only essential fields to minimize token usage.
-            
-            IMPORTANT: For projects with many tasks:
-            1. First use count_tasks() to check total count
-            2. Then request specific pages with page_size=10
-            
-            Args:
-                project_id: Filter by project ID
-                assignee_id: Filter by assignee ID
-                closed: Filter by closed status
-                page: Page number (default: 1)
-                page_size: Results per page (default: 10, max: 20)
-            """
-            # Enforce limits
-            page_size = min(page_size, 20)
-            
-            params = {
-                "page[number]": page,
-                "page[size]": page_size
-            }
-            
-            if project_id:
-                params["filter[project_id]"] = project_id
-            if assignee_id:
-                params["filter[assignee_id]"] = assignee_id
-            if closed is not None:
-                params["filter[closed]"] = str(closed).lower()
-            
-            result = await productive_service.get("/tasks", params=params)
-            summarized = summarize_tasks(result)
-            
-            return json.dumps(summarized, indent=2)
+        Args:
+            project_id: Filter by project ID
+            assignee_id: Filter by assignee ID
+            closed: Filter by closed status
+        """
+        params = {
+            "page[number]": 1,
+            "page[size]": 1,
+            "stats[total]": "count",
+            **task_filters(project_id, assignee_id, closed),
+        }
         
-        @server.tool()
-        async def get_task(task_id: str) -> str:
-            """
-            Get FULL details of a specific task.
-            Use this after list_tasks to get complete information for specific tasks.
-            
-            Args:
-                task_id: The ID of the task
-            """
-            result = await productive_service.get(f"/tasks/{task_id}")
-            return json.dumps(result, indent=2)
+        result = await self.productive_service.get("/tasks", params=params)
+        
+        estimated_total, _, exact = estimate_task_count(result, page_size=1)
+        total_pages = max(1, math.ceil(estimated_total / recommended_page_size))
+        
+        info = {
+            "estimated_total": estimated_total,
+            "estimated_pages": total_pages,
+            "exact": exact,
+            "recommendation": (
+                f"{'' if exact else 'Approximately '}{estimated_total} tasks found. "
+                f"Recommend requesting pages 1-{min(3, total_pages)} "
+                f"with page_size={recommended_page_size} to stay under token limits."
+            )
+        }
+        
+        return _dumps(info)
+    
+    async def list_tasks(
+        self,
+        project_id: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        closed: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> str:
+        """
+        List tasks from Productive.io with automatic summarization.
+        Returns only essential fields to minimize token usage.
+        
+        IMPORTANT: For projects with many tasks:
+        1. First use count_tasks() to check total count
+        2. Then request specific pages with page_size=10
+        
+        Args:
+            project_id: Filter by project ID
+            assignee_id: Filter by assignee ID
+            closed: Filter by closed status
+            page: Page number (default: 1)
+            page_size: Results per page (default: 10, max: 20)
+        """
+        # Enforce limits
+        page_size = min(page_size, 20)
+        
+        params = {
+            "page[number]": page,
+            "page[size]": page_size,
+            **task_filters(project_id, assignee_id, closed),
+        }
+        
+        result = await self.productive_service.get("/tasks", params=params)
+        summarized = summarize_tasks(result)
+        
+        return _dumps(summarized)
+    
+    async def list_tasks_with_count(
+        self,
+        project_id: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        closed: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> str:
+        """
+        List tasks together with the total count of matching tasks.
+        Fetches the count with the requested page in a single request, so
+        prefer this over calling count_tasks() and then list_tasks().
+        
+        Args:
+            project_id: Filter by project ID
+            assignee_id: Filter by assignee ID
+            closed: Filter by closed status
+            page: Page number (default: 1)
+            page_size: Results per page (default: 10, max: 20)
+        """
+        # Enforce limits
+        page_size = min(page_size, 20)
+        
+        params = {
+            "page[number]": page,
+            "page[size]": page_size,
+            "stats[total]": "count",
+            **task_filters(project_id, assignee_id, closed),
+        }
+        
+        result = await self.productive_service.get("/tasks", params=params)
+        
+        summarized = summarize_tasks(result)
+        (
+            summarized["total_count"],
+            summarized["total_pages"],
+            summarized["total_count_exact"],
+        ) = estimate_task_count(result, page_size)
+        
+        return _dumps(summarized)
+    
+    async def get_task(self, task_id: str) -> str:
+        """
+        Get FULL details of a specific task.
+        Use this after list_tasks to get complete information for specific tasks.
+        
+        Args:
+            task_id: The ID of the task
+        """
+        result = await self.productive_service.get(f"/tasks/{task_id}")
+        return _dumps(result)
+
+
+def initialize_tools(productive_service: ProductiveService, server: "FastMCP"):
+    """Initialize all MCP tools based on service configuration."""
+    
+    # Tasks tools with optimization
+    if productive_service.tasks_enabled:
+        task_tools = TaskTools(productive_service)
+        server.tool(task_tools.count_tasks)
+        server.tool(task_tools.list_tasks)
+        server.tool(task_tools.list_tasks_with_count)
+        server.tool(task_tools.get_task)
+
 
 def main():
     args = parse_arguments()
     
+    # Only read .env when some of the server's variables aren't already set
+    if not all(os.environ.get(name) for name in env_var_names):
+        from dotenv import load_dotenv
+        
+        load_dotenv(override=False)
+    
+    from fastmcp import FastMCP
+    
     # Create server with lifespan that has access to args
     server = FastMCP("Productive.io MCP Server", lifespan=create_lifespan(args))
     
@@ -464,6 +737,10 @@ def main():
     except Exception as e:
         print(f"Error starting MCP server: {e}")
         raise
+    finally:
+        # The HTTP clients outlive individual sessions, so close them on exit
+        if _http_clients:
+            asyncio.run(close_http_clients())
 
 
 if __name__ == "__main__":